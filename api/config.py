@@ -1,6 +1,18 @@
+from pathlib import Path
+
 DB_HOST = "127.0.0.1"
 DB_PORT = 5432
 DB_USER = "postgres"
 DB_PASSWORD = "postgres"
 DB_NAME = "data"
-DEFAULT_CHUNK_SIZE = 1024 * 1024 * 50  # 50 megabytes
+DB_POOL_SIZE = 16  # maximum number of pooled database connections
+DEFAULT_CHUNK_SIZE = 1024 * 1024 * 4  # 4 megabytes
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024 * 8  # 8 megabytes
+OGC_PAGE_WORKERS = 8  # concurrent page requests for OGC API and WFS downloads
+MAX_CONCURRENT_UPLOADS = 8  # uploads processed at once, others wait their turn
+SHEET_UPLOAD_WORKERS = 4  # concurrent sheet imports for a single workbook
+MEDIA_DIR = Path.cwd() / "media"  # uploads are staged in a directory per request
+ARCGIS_METADATA_WORKERS = 16  # concurrent ArcGIS layer information requests
+ARCGIS_UPLOAD_WORKERS = 4  # concurrent layer imports for ArcGIS services
+HTTP_POOL_SIZE = 32  # kept-alive connections per host for URL uploads
+HTTP_TIMEOUT = (5, 60)  # connect and read timeouts in seconds for URL uploads
@@ -1,13 +1,21 @@
-import json
-import os
+import mmap
+import threading
 from contextlib import asynccontextmanager
 
+import orjson
+import requests
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from psycopg2.pool import ThreadedConnectionPool
+from urllib3.util import Retry
 
 from api import config
 from api.models import HealthCheckResponse
 from api.routers.upload_anything import router as upload_anything_router
+from api.routers.upload_anything.utilities import (
+    index_geographies,
+    index_map_services,
+)
 from api.version import __version__
 
 
@@ -17,13 +25,47 @@ async def lifespan(app: FastAPI):
     FastAPI lifespan event to initialize the application.
 
     This event is called on application startup and shutdown. On startup, it reads the
-    geographies.json file to initialize the list of geographies.
+    geographies.json file to initialize the list of geographies, ordered by rank,
+    creates the media directory, opens the database connection pool, indexes the
+    join columns of the map service tables and creates the HTTP session used for URL
+    uploads. On shutdown, it closes the HTTP session and the connection pool.
     """
-    if os.path.exists("api/geographies.json") is False:
-        raise Exception("api/geographies.json not found")
-    with open("api/geographies.json", "r") as f:
-        app.state.geographies = json.loads(f.read())
+    with (
+        open("api/geographies.json", "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as geographies_file,
+        memoryview(geographies_file) as buffer,
+    ):
+        geographies = sorted(orjson.loads(buffer), key=lambda x: x["rank"])
+    app.state.geographies = geographies
+    app.state.potential_names = index_geographies(geographies)
+    config.MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    app.state.pg_pool = ThreadedConnectionPool(
+        minconn=1,
+        maxconn=config.DB_POOL_SIZE,
+        dbname=app.state.dbname,
+        user=app.state.dbuser,
+        password=app.state.dbpass,
+        host=app.state.dbhost,
+        port=app.state.dbport,
+    )
+    app.state.pg_pool_slots = threading.BoundedSemaphore(config.DB_POOL_SIZE)
+    index_map_services(app)
+    app.state.http = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=config.HTTP_POOL_SIZE,
+        pool_maxsize=config.HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(429, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    )
+    app.state.http.mount("http://", adapter)
+    app.state.http.mount("https://", adapter)
     yield
+    app.state.http.close()
+    app.state.pg_pool.closeall()
 
 
 app = FastAPI(
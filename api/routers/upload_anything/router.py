@@ -1,14 +1,15 @@
-import csv
+import asyncio
 import os
 import shutil
 import zipfile
 from typing import List
+from uuid import uuid4
 
-import aiofiles
 import openpyxl
-from fastapi import APIRouter, File, HTTPException, Request, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 
-from api.config import DEFAULT_CHUNK_SIZE
+from api.config import MAX_CONCURRENT_UPLOADS, MEDIA_DIR, SHEET_UPLOAD_WORKERS
 from api.routers.upload_anything.upload_models import (
     ResponseModel,
     uploadUrlRequestModel,
@@ -21,14 +22,45 @@ from api.routers.upload_anything.url_utilities import (
     upload_ogc_wfs,
 )
 from api.routers.upload_anything.utilities import (
+    save_upload_file,
     upload_csv_file,
     upload_flat_file,
+    upload_worksheet_csv,
+    write_worksheet_csv,
 )
 
 router = APIRouter()
 
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv"
+ZIP_CONTENT_TYPE = "application/zip"
 
-@router.post(path="/upload_file", response_model=List[ResponseModel])
+URL_UPLOAD_HANDLERS = (
+    ("arcgis", download_arcgis_service_information),
+    ("docs.google.com/spreadsheets", upload_google_sheets),
+    ("collection", upload_ogc_api_feature_collection),
+    ("service=wfs", upload_ogc_wfs),
+)
+
+upload_semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+
+async def limit_concurrent_uploads():
+    """
+    Dependency that holds one of MAX_CONCURRENT_UPLOADS slots while an upload is
+    processed, so that a burst of uploads queues instead of starting an unbounded
+    number of ogr2ogr processes and threadpool workers. Database connections are
+    bounded separately by get_db_connection, which waits for a free pooled connection.
+    """
+    async with upload_semaphore:
+        yield
+
+
+@router.post(
+    path="/upload_file",
+    response_model=List[ResponseModel],
+    dependencies=[Depends(limit_concurrent_uploads)],
+)
 async def upload_file(request: Request, file: UploadFile = File(...)):
     """
     Upload a file to the server and import it into a PostgreSQL database.
@@ -46,95 +78,95 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
     - ZIP (containing one of the above formats)
     """
 
-    file_name = str(file.filename)
+    file_name = os.path.basename(str(file.filename))
+    stem, extension = os.path.splitext(file_name)
 
-    write_file_path = f"{os.getcwd()}/media/{file.filename}"
+    job_dir = MEDIA_DIR / uuid4().hex
+    write_file_path = str(job_dir / file_name)
 
     try:
-        if os.path.exists(f"{os.getcwd()}/media/") is False:
-            os.mkdir(f"{os.getcwd()}/media/")
-        async with aiofiles.open(write_file_path, "wb") as new_file:
-            while chunk := await file.read(DEFAULT_CHUNK_SIZE):
-                await new_file.write(chunk)
+        job_dir.mkdir()
+        await run_in_threadpool(save_upload_file, file.file, write_file_path)
     except Exception as e:
-        if file.filename:
-            media_directory = os.listdir(
-                f"{os.getcwd()}/media/{file.filename.split('.')[0]}"
-            )
-            for uploaded_file in media_directory:
-                if file_name in uploaded_file:
-                    os.remove(
-                        f"{os.getcwd()}/media/{file.filename.split('.')[0]}/{uploaded_file}"
-                    )
+        await run_in_threadpool(shutil.rmtree, job_dir, ignore_errors=True)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="There was an error uploading the file. Error: " + str(e),
         )
 
-    if (
-        file.content_type
-        == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    ):
-        new_file_name = file_name.split(".")[0]
-
-        os.makedirs(f"{os.getcwd()}/media/{new_file_name}")
-        workbook = openpyxl.load_workbook(f"{os.getcwd()}/media/{new_file_name}.xlsx")
-        results = []
-        for sheet in workbook:
-            worksheet = workbook[sheet.title]
-            with open(
-                f"{os.getcwd()}/media/{new_file_name}/{sheet.title}.csv",
-                "w",
-                newline="",
-            ) as csvfile:
-                csvwriter = csv.writer(csvfile)
-                for row in worksheet.iter_rows(values_only=True):
-                    csvwriter.writerow(row)
-            result = upload_csv_file(
-                write_file_path=f"{os.getcwd()}/media/{new_file_name}/{sheet.title}.csv",
-                file_name=sheet.title,
-                app=request.app,
+    try:
+        if file.content_type == XLSX_CONTENT_TYPE:
+            sheet_directory = job_dir / stem
+
+            sheet_directory.mkdir()
+            workbook = await run_in_threadpool(
+                openpyxl.load_workbook,
+                write_file_path,
+                read_only=True,
+                data_only=True,
+                keep_links=False,
             )
-            results.append(result)
-
-        shutil.rmtree(f"{os.getcwd()}/media/{new_file_name}")
-        media_directory = os.listdir(f"{os.getcwd()}/media/")
-        for uploaded_file in media_directory:
-            if file_name in uploaded_file:
-                os.remove(f"{os.getcwd()}/media/{uploaded_file}")
-    elif file.content_type == "text/csv":
-        result = upload_csv_file(
-            write_file_path=write_file_path,
-            file_name=file_name,
-            app=request.app,
-        )
+            sheet_names = []
+            try:
+                for worksheet in workbook:
+                    await run_in_threadpool(
+                        write_worksheet_csv,
+                        worksheet=worksheet,
+                        file_path=f"{sheet_directory}/{worksheet.title}.csv",
+                    )
+                    sheet_names.append(worksheet.title)
+            finally:
+                workbook.close()
+
+            semaphore = asyncio.Semaphore(SHEET_UPLOAD_WORKERS)
+
+            async def _process_sheet(sheet_name: str) -> dict | None:
+                async with semaphore:
+                    return await run_in_threadpool(
+                        upload_worksheet_csv,
+                        write_file_path=f"{sheet_directory}/{sheet_name}.csv",
+                        sheet_name=sheet_name,
+                        app=request.app,
+                    )
 
-        if result["status"] is False:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=result["message"],
+            # Wait for every sheet before the sheet CSVs are removed, then report
+            # the first failure.
+            sheet_results = await asyncio.gather(
+                *map(_process_sheet, sheet_names), return_exceptions=True
+            )
+            results = []
+            for sheet_result in sheet_results:
+                if isinstance(sheet_result, BaseException):
+                    raise sheet_result
+                if sheet_result is not None:
+                    results.append(sheet_result)
+        elif file.content_type == CSV_CONTENT_TYPE:
+            result = await run_in_threadpool(
+                upload_csv_file,
+                write_file_path=write_file_path,
+                file_name=file_name,
+                app=request.app,
             )
 
-        media_directory = os.listdir(f"{os.getcwd()}/media/")
-        for uploaded_file in media_directory:
-            if file_name in uploaded_file:
-                os.remove(f"{os.getcwd()}/media/{uploaded_file}")
+            if result["status"] is False:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=result["message"],
+                )
 
-        results = [result]
-    else:
-        new_file_name = file_name.split(".")[0]
-        if file.content_type == "application/zip":
+            results = [result]
+        elif file.content_type == ZIP_CONTENT_TYPE:
+            extract_directory = job_dir / stem
             with zipfile.ZipFile(write_file_path, "r") as zip_ref:
-                zip_ref.extractall(f"{os.getcwd()}/media/{new_file_name}")
-            media_directory = os.listdir(f"{os.getcwd()}/media/{new_file_name}")
+                await run_in_threadpool(zip_ref.extractall, extract_directory)
             results = []
-            for uploaded_file in media_directory:
-                file_path = f"{os.getcwd()}/media/{new_file_name}/{uploaded_file}"
-                file_extension = file_path.split(".")[-1]
-                result = upload_flat_file(
-                    file_path=file_path,
-                    file_extension=file_extension,
-                    file_name=uploaded_file.split(".")[0],
+            for uploaded_file in os.listdir(extract_directory):
+                uploaded_stem, uploaded_extension = os.path.splitext(uploaded_file)
+                result = await run_in_threadpool(
+                    upload_flat_file,
+                    file_path=f"{extract_directory}/{uploaded_file}",
+                    file_extension=uploaded_extension[1:],
+                    file_name=uploaded_stem,
                     app=request.app,
                     zip_file=True,
                 )
@@ -148,24 +180,25 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="The file provided is not a valid geographic file or has invalid geometry.",
                 )
-            if os.path.exists(f"{os.getcwd()}/media/{file_name}"):
-                shutil.rmtree(f"{os.getcwd()}/media/{new_file_name}")
-            media_directory = os.listdir(f"{os.getcwd()}/media/")
-            for uploaded_file in media_directory:
-                if file_name in uploaded_file:
-                    os.remove(f"{os.getcwd()}/media/{uploaded_file}")
         else:
-            results = upload_flat_file(
+            results = await run_in_threadpool(
+                upload_flat_file,
                 file_path=write_file_path,
-                file_name=file_name.split(".")[0],
-                file_extension=write_file_path.split(".")[-1],
+                file_name=stem,
+                file_extension=extension[1:],
                 app=request.app,
             )
+    finally:
+        await run_in_threadpool(shutil.rmtree, job_dir, ignore_errors=True)
 
     return results
 
 
-@router.post(path="/upload_url", response_model=List[ResponseModel])
+@router.post(
+    path="/upload_url",
+    response_model=List[ResponseModel],
+    dependencies=[Depends(limit_concurrent_uploads)],
+)
 async def upload_url(
     request: Request,
     info: uploadUrlRequestModel,
@@ -181,19 +214,10 @@ async def upload_url(
     Flat Files
     """
 
-    if "arcgis" in info.url.lower():
-        results = download_arcgis_service_information(url=info.url, app=request.app)
-
-    elif "docs.google.com/spreadsheets" in info.url.lower():
-        results = upload_google_sheets(url=info.url, app=request.app)
-
-    elif "collection" in info.url.lower():
-        results = upload_ogc_api_feature_collection(url=info.url, app=request.app)
+    url = info.url.lower()
+    upload_handler = next(
+        (handler for pattern, handler in URL_UPLOAD_HANDLERS if pattern in url),
+        download_data_from_url,
+    )
 
-    elif "service=wfs" in info.url.lower():
-        results = upload_ogc_wfs(url=info.url, app=request.app)
-
-    else:
-        results = download_data_from_url(url=info.url, app=request.app)
-
-    return results
+    return await run_in_threadpool(upload_handler, url=info.url, app=request.app)
@@ -1,31 +1,121 @@
-import json
 import os
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
+import orjson
 import requests
 from fastapi import FastAPI, HTTPException, status
 
+from api.config import (
+    ARCGIS_METADATA_WORKERS,
+    ARCGIS_UPLOAD_WORKERS,
+    DOWNLOAD_CHUNK_SIZE,
+    HTTP_TIMEOUT,
+    MEDIA_DIR,
+    OGC_PAGE_WORKERS,
+)
 from api.routers.upload_anything.utilities import (
     clean_string,
+    ogr2ogr_command,
+    stream_features_to_pg,
     upload_csv_file,
     upload_geographic_file,
 )
 
+WFS_PAGE_SIZE = 50
+STREAMING_EXTENSIONS = (
+    ".csv",
+    ".geojson",
+    ".geojsonl",
+    ".geojsons",
+    ".gml",
+    ".gpx",
+    ".json",
+    ".kml",
+)
+SHEET_NAME_TABLE = str.maketrans({'"': None, " ": "_", "-": "_"})
+
+
+def fetch_json(url: str, app: FastAPI):
+    """
+    Downloads a JSON document.
+
+    Args:
+        url (str): The URL of the JSON document.
+        app (FastAPI): The FastAPI application instance.
+
+    Returns:
+        The parsed JSON document.
+    """
+    return orjson.loads(app.state.http.get(url, timeout=HTTP_TIMEOUT).content)
+
+
+def save_response(response: requests.Response, file_path: str):
+    """
+    Streams the body of a response to a file without holding it in memory.
+
+    Args:
+        response (requests.Response): A response requested with stream=True.
+        file_path (str): The path of the file to write.
+    """
+    response.raw.decode_content = True
+    with open(file_path, "wb") as f:
+        shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+
 
 def upload_arcgis_service(url: str, service_name: str, app: FastAPI):
+    """
+    Imports a single ArcGIS service layer into a PostgreSQL database using the
+    ogr2ogr command.
+
+    Args:
+        url (str): The URL of the ArcGIS service layer.
+        service_name (str): The name of the PostgreSQL table where the data will be stored.
+        app (FastAPI): The FastAPI application instance.
+    """
     service_name = clean_string(service_name)
 
-    subprocess.call(
-        f"""ogr2ogr -f "PostgreSQL" PG:"dbname={app.state.dbname} user={app.state.dbuser} password={app.state.dbpass} host={app.state.dbhost} port={app.state.dbport}" \
-        "{url}/query?where=1=1&outfields=*&f=geojson" -nln {service_name} -lco FID=gid -lco GEOMETRY_NAME=geom  -overwrite""",
-        shell=True,
+    subprocess.run(
+        ogr2ogr_command(
+            source=f"{url}/query?where=1=1&outfields=*&f=geojson",
+            table_name=service_name,
+            app=app,
+        )
     )
 
 
+def fetch_arcgis_layer(url: str, app: FastAPI):
+    """
+    Downloads the information of a single layer of an ArcGIS service.
+
+    Args:
+        url (str): The URL of the layer.
+        app (FastAPI): The FastAPI application instance.
+
+    Raises:
+        HTTPException: If there is an error downloading the layer information.
+    """
+    layer_response = app.state.http.get(f"{url}?f=json", timeout=HTTP_TIMEOUT)
+
+    if layer_response.status_code != 200 or "error" in (
+        layer_information := orjson.loads(layer_response.content)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="There was an error downloading the service",
+        )
+
+    return layer_information
+
+
 def download_arcgis_service_information(url: str, app: FastAPI):
     """
     Downloads an ArcGIS service using the ArcGIS REST API and then uploads each layer
-    in the service to the server.
+    in the service to the server. Layer information is requested concurrently and
+    the queryable layers are uploaded a few at a time.
 
     Args:
         url (str): The URL of the ArcGIS service to be downloaded.
@@ -33,46 +123,54 @@ def download_arcgis_service_information(url: str, app: FastAPI):
     Raises:
         HTTPException: If there is an error downloading the service.
     """
-    response = requests.get(f"{url}?f=pjson", timeout=60)
+    response = app.state.http.get(f"{url}?f=pjson", timeout=HTTP_TIMEOUT)
 
-    if response.status_code != 200 or "error" in response.json():
+    if response.status_code != 200 or "error" in (
+        data := orjson.loads(response.content)
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="There was an error downloading the service",
         )
 
-    data = response.json()
-
     if "layers" in data:
         if url[-1] != "/":
             url += "/"
-        results = []
-        for layer in data["layers"]:
-            layer_response = requests.get(f"{url}{layer['id']}?f=json", timeout=60)
-
-            if layer_response.status_code != 200 or "error" in layer_response.json():
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="There was an error downloading the service",
-                )
-
-            layer_information = layer_response.json()
-
-            if "Query" in layer_information["capabilities"]:
-                upload_arcgis_service(
-                    url=f"{url}{layer_information['id']}",
-                    service_name=layer_information["name"].lower().replace(" ", "_"),
-                    app=app,
+        with ThreadPoolExecutor(max_workers=ARCGIS_METADATA_WORKERS) as executor:
+            layers = list(
+                executor.map(
+                    lambda layer: fetch_arcgis_layer(f"{url}{layer['id']}", app),
+                    data["layers"],
                 )
+            )
 
-                results.append(
-                    {
-                        "status": True,
-                        "table_name": layer_information["name"]
+        queryable_layers = [
+            layer_information
+            for layer_information in layers
+            if "Query" in layer_information["capabilities"]
+        ]
+
+        with ThreadPoolExecutor(max_workers=ARCGIS_UPLOAD_WORKERS) as executor:
+            list(
+                executor.map(
+                    lambda layer_information: upload_arcgis_service(
+                        url=f"{url}{layer_information['id']}",
+                        service_name=layer_information["name"]
                         .lower()
                         .replace(" ", "_"),
-                    }
+                        app=app,
+                    ),
+                    queryable_layers,
                 )
+            )
+
+        results = [
+            {
+                "status": True,
+                "table_name": layer_information["name"].lower().replace(" ", "_"),
+            }
+            for layer_information in queryable_layers
+        ]
 
         return results
 
@@ -98,51 +196,50 @@ def upload_google_sheets(url: str, app: FastAPI):
     # TODO support multiple sheets
     google_doc_id = url.split("d/")[1].split("/")[0]
     url = f"https://docs.google.com/spreadsheets/d/{google_doc_id}/export?format=csv&gid=0"
-    response = requests.get(url, timeout=60)
-
-    if response.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="There was an error downloading the spreadsheet",
-        )
-
-    content_disposition = str(response.headers.get("content-disposition"))
+    with tempfile.TemporaryDirectory(dir=MEDIA_DIR) as job_dir:
+        write_file_path = os.path.join(job_dir, f"{google_doc_id}.csv")
+        with app.state.http.get(url, stream=True, timeout=HTTP_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="There was an error downloading the spreadsheet",
+                )
 
-    file_name = (
-        content_disposition.split("filename=")[1]
-        .split(";")[0]
-        .replace('"', "")
-        .replace(".csv", "")
-        .lower()
-        .replace(" ", "_")
-        .replace("-", "_")
-    )
+            content_disposition = str(response.headers.get("content-disposition"))
 
-    with open(f"{os.getcwd()}/media/{google_doc_id}.csv", "wb") as f:
-        f.write(response.content)
+            file_name = (
+                content_disposition.split("filename=")[1]
+                .split(";")[0]
+                .replace(".csv", "")
+                .translate(SHEET_NAME_TABLE)
+                .lower()
+            )
 
-    upload_csv_file(
-        write_file_path=f"{os.getcwd()}/media/{google_doc_id}.csv",
-        file_name=file_name,
-        app=app,
-    )
+            save_response(response, write_file_path)
 
-    os.remove(f"{os.getcwd()}/media/{google_doc_id}.csv")
+        upload_csv_file(
+            write_file_path=write_file_path,
+            file_name=file_name,
+            app=app,
+        )
 
-    return [{"status": True, "table_name": file_name}]
+    return [{"status": True, "table_name": clean_string(file_name)}]
 
 
 def upload_ogc_api_feature_collection(url: str, app: FastAPI):
     """
     Downloads a OGC API feature collection and imports it into a PostgreSQL database.
 
-    The collection is downloaded using the requests library and imported into a PostgreSQL database using the psycopg2 library.
+    The collection is downloaded page by page and each page is streamed into ogr2ogr
+    as it arrives, so the whole collection is never held in memory. Paging stops at
+    numberMatched when the server reports it, and otherwise at the first page that is
+    shorter than the first one or that repeats it because the server ignored offset.
 
     Args:
         url (str): The URL of the OGC API feature collection to be imported.
     """
     collection_id = url.split("collections/")[1].split("/")[0]
-    response = requests.get(f"{url}/items", timeout=60)
+    response = app.state.http.get(f"{url}/items", timeout=HTTP_TIMEOUT)
 
     if response.status_code != 200:
         raise HTTPException(
@@ -150,28 +247,42 @@ def upload_ogc_api_feature_collection(url: str, app: FastAPI):
             detail="There was an error downloading the feature collection",
         )
 
-    feature_collection = response.json()
-
-    numberMatched = feature_collection["numberMatched"]
-    numberGenerated = feature_collection["numberReturned"]
-
-    while numberMatched > numberGenerated:
-        response = requests.get(f"{url}/items?offset={numberGenerated}", timeout=60)
-        feature_collection["features"].extend(response.json()["features"])
-        numberGenerated += response.json()["numberReturned"]
+    feature_collection = orjson.loads(response.content)
 
-    with open(f"{os.getcwd()}/media/{collection_id}.geojson", "w") as f:
-        json.dump(feature_collection, f)
-
-    upload_geographic_file(
-        file_path=f"{os.getcwd()}/media/{collection_id}.geojson",
-        table_name=collection_id,
-        app=app,
+    number_matched = feature_collection.get("numberMatched")
+    page_size = feature_collection.get(
+        "numberReturned", len(feature_collection["features"])
+    )
+    window_size = page_size * OGC_PAGE_WORKERS
+
+    def iter_features():
+        yield from feature_collection["features"]
+        if page_size == 0:
+            return
+        window_start = page_size
+        with ThreadPoolExecutor(max_workers=OGC_PAGE_WORKERS) as executor:
+            while number_matched is None or window_start < number_matched:
+                window_end = window_start + window_size
+                if number_matched is not None:
+                    window_end = min(window_end, number_matched)
+                pages = executor.map(
+                    lambda offset: fetch_json(
+                        f"{url}/items?offset={offset}&limit={page_size}", app
+                    ),
+                    range(window_start, window_end, page_size),
+                )
+                for page in pages:
+                    features = page["features"]
+                    if features[:1] == feature_collection["features"][:1]:
+                        return
+                    yield from features
+                    if len(features) < page_size:
+                        return
+                window_start += window_size
+
+    return stream_features_to_pg(
+        features=iter_features(), table_name=collection_id, app=app
     )
-
-    os.remove(f"{os.getcwd()}/media/{collection_id}.geojson")
-
-    return [{"status": True, "table_name": collection_id}]
 
 
 def upload_ogc_wfs(url: str, app: FastAPI):
@@ -179,8 +290,10 @@ def upload_ogc_wfs(url: str, app: FastAPI):
     Downloads an OGC WFS feature collection and imports it into a PostgreSQL database.
 
     This function retrieves features from an OGC WFS service in batches of 50,
-    converting them into a GeoJSON file, which is then imported into a PostgreSQL
-    database table. The table name is derived from the typeName parameter in the URL.
+    requesting several batches at a time, and streams the features into ogr2ogr,
+    which imports them into a PostgreSQL database table. Paging stops at the first
+    batch that is not full or that repeats the first one because the server ignored
+    startIndex. The table name is derived from the typeName parameter in the URL.
 
     Args:
         url (str): The URL of the OGC WFS service from which to download features.
@@ -188,8 +301,8 @@ def upload_ogc_wfs(url: str, app: FastAPI):
     Raises:
         HTTPException: If there is an error downloading the WFS feature collection.
     """
-    response = requests.get(
-        f"{url}&maxFeatures=50&outputFormat=application%2Fjson", timeout=60
+    response = app.state.http.get(
+        f"{url}&maxFeatures=50&outputFormat=application%2Fjson", timeout=HTTP_TIMEOUT
     )
     collection_id = clean_string(url.split("typeName=")[1].split("&")[0])
 
@@ -205,41 +318,47 @@ def upload_ogc_wfs(url: str, app: FastAPI):
             detail="There was an error downloading the wfs",
         )
 
-    feature_collection = response.json()
-    total_features = 50
-    more_features = True
-
-    while more_features:
-        response = requests.get(
-            f"{url}&maxFeatures=50&startIndex={total_features}&outputFormat=application%2Fjson",
-            timeout=60,
-        )
-        if response.json()["features"] == []:
-            more_features = False
-        feature_collection["features"].extend(response.json()["features"])
-        total_features += 50
-
-    with open(f"{os.getcwd()}/media/{collection_id}.geojson", "w") as f:
-        json.dump(feature_collection, f)
-
-    upload_geographic_file(
-        file_path=f"{os.getcwd()}/media/{collection_id}.geojson",
-        table_name=collection_id,
-        app=app,
+    first_page = orjson.loads(response.content)
+
+    def iter_features():
+        yield from first_page["features"]
+        if len(first_page["features"]) < WFS_PAGE_SIZE:
+            return
+        total_features = WFS_PAGE_SIZE
+        window_size = WFS_PAGE_SIZE * OGC_PAGE_WORKERS
+        with ThreadPoolExecutor(max_workers=OGC_PAGE_WORKERS) as executor:
+            while True:
+                pages = executor.map(
+                    lambda start_index: fetch_json(
+                        f"{url}&maxFeatures={WFS_PAGE_SIZE}&startIndex={start_index}&outputFormat=application%2Fjson",
+                        app,
+                    ),
+                    range(total_features, total_features + window_size, WFS_PAGE_SIZE),
+                )
+                for page in pages:
+                    features = page["features"]
+                    if features[:1] == first_page["features"][:1]:
+                        return
+                    yield from features
+                    if len(features) < WFS_PAGE_SIZE:
+                        return
+                total_features += window_size
+
+    return stream_features_to_pg(
+        features=iter_features(), table_name=collection_id, app=app
     )
 
-    os.remove(f"{os.getcwd()}/media/{collection_id}.geojson")
-
-    return [{"status": True, "table_name": collection_id}]
-
 
 def download_data_from_url(url: str, app: FastAPI):
     """
     Downloads data from a URL and imports it into a PostgreSQL database.
 
-    This function is a wrapper around the requests library and the
-    upload_geographic_file function. It downloads a file from the given
-    URL and then uploads it to the PostgreSQL database as a new table.
+    The URL is first handed to ogr2ogr through GDAL's /vsicurl/ file system, so the
+    file is read straight from the server without being written to disk. Formats
+    that are read from start to end use /vsicurl_streaming/, which downloads the
+    file in a single request instead of many range requests. If GDAL
+    cannot read it that way, the file is downloaded with the requests library and
+    uploaded with the upload_geographic_file function instead.
 
     Args:
         url (str): The URL of the file to be downloaded and imported.
@@ -247,23 +366,42 @@ def download_data_from_url(url: str, app: FastAPI):
     Raises:
         HTTPException: If there is an error downloading the file.
     """
-    response = requests.get(url, timeout=60)
-
-    if response.status_code != 200:
+    if urlparse(url).scheme not in ("http", "https"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="There was an error downloading the file",
+            detail="Only http and https URLs are supported",
         )
 
-    with open(f"{os.getcwd()}/media/{url.split('/')[-1]}", "wb") as f:
-        f.write(response.content)
+    file_name = url.split("/")[-1]
+    table_name, extension = os.path.splitext(file_name)
 
-    upload_geographic_file(
-        file_path=f"{os.getcwd()}/media/{url.split('/')[-1]}",
-        table_name=url.split("/")[-1].split(".")[0],
-        app=app,
+    extension = extension.lower()
+    if extension in STREAMING_EXTENSIONS:
+        source = f"/vsicurl_streaming/{url}"
+    elif extension == ".zip":
+        source = f"/vsizip//vsicurl/{url}"
+    else:
+        source = f"/vsicurl/{url}"
+
+    results = upload_geographic_file(
+        file_path=source, table_name=table_name, app=app, zip_file=True
     )
+    if results[0]["status"] is True:
+        return results
 
-    os.remove(f"{os.getcwd()}/media/{url.split('/')[-1]}")
+    with tempfile.TemporaryDirectory(dir=MEDIA_DIR) as job_dir:
+        write_file_path = os.path.join(job_dir, file_name)
+        with app.state.http.get(url, stream=True, timeout=HTTP_TIMEOUT) as response:
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="There was an error downloading the file",
+                )
 
-    return [{"status": True, "table_name": url.split("/")[-1].split(".")[0]}]
+            save_response(response, write_file_path)
+
+        return upload_geographic_file(
+            file_path=write_file_path,
+            table_name=table_name,
+            app=app,
+        )
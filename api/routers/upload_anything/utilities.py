@@ -1,14 +1,38 @@
 import csv
-import json
 import os
 import shutil
 import subprocess
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator
 
-import geojson
 import openpyxl
+import orjson
 import psycopg2
 from fastapi import FastAPI, HTTPException, status
-from shapely import wkb, wkt
+from psycopg2 import sql
+
+from api.config import DEFAULT_CHUNK_SIZE
+
+RESERVED_COLUMN_NAMES = ("gid", "geom")
+POINT_GEOGRAPHY = "latitude_and_longitude"
+GEOMETRY_GEOGRAPHIES = ("geojson_geometry", "wkt_geometry", "wkb_geometry")
+OGR2OGR_PATH = shutil.which("ogr2ogr") or "ogr2ogr"
+CLEAN_STRING_TABLE = str.maketrans({" ": "_", "-": "_", ".": None, ":": "_"})
+
+COORDINATE_SQL = sql.SQL(
+    r"""CASE WHEN {column} ~ '^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$'
+    THEN {column}::double precision END"""
+)
+
+GEOMETRY_SQL = {
+    "geojson": sql.SQL("ST_SetSRID(ST_GeomFromGeoJSON(NULLIF({column}, '')), 4326)"),
+    "wkt": sql.SQL("ST_SetSRID(ST_GeomFromEWKT(NULLIF({column}, '')), 4326)"),
+    "wkb": sql.SQL(
+        "ST_SetSRID(ST_GeomFromEWKB(decode(NULLIF({column}, ''), 'hex')), 4326)"
+    ),
+}
 
 
 def upload_flat_file(
@@ -37,56 +61,128 @@ def upload_flat_file(
         results = [result]
 
     elif file_extension.lower() == "xlsx":
-        new_file_name = file_name.split(".")[0]
-        os.makedirs(f"{os.getcwd()}/media/{new_file_name}/{new_file_name}")
+        sheet_directory = os.path.splitext(file_path)[0]
+        os.makedirs(sheet_directory)
         workbook = openpyxl.load_workbook(
-            f"{os.getcwd()}/media/{new_file_name}/{new_file_name}.xlsx"
+            file_path,
+            read_only=True,
+            data_only=True,
+            keep_links=False,
         )
+        sheet_names = []
+        try:
+            for worksheet in workbook:
+                write_worksheet_csv(
+                    worksheet=worksheet,
+                    file_path=f"{sheet_directory}/{worksheet.title}.csv",
+                )
+                sheet_names.append(worksheet.title)
+        finally:
+            workbook.close()
         results = []
-        for sheet in workbook:
-            worksheet = workbook[sheet.title]
-            with open(
-                f"{os.getcwd()}/media/{new_file_name}/{new_file_name}/{sheet.title}.csv",
-                "w",
-                newline="",
-            ) as csvfile:
-                csvwriter = csv.writer(csvfile)
-                for row in worksheet.iter_rows(values_only=True):
-                    csvwriter.writerow(row)
-            result = upload_csv_file(
-                write_file_path=f"{os.getcwd()}/media/{new_file_name}/{new_file_name}/{sheet.title}.csv",
-                file_name=sheet.title,
+        for sheet_name in sheet_names:
+            sheet_result = upload_worksheet_csv(
+                write_file_path=f"{sheet_directory}/{sheet_name}.csv",
+                sheet_name=sheet_name,
                 app=app,
             )
-            results.append(result)
-        shutil.rmtree(f"{os.getcwd()}/media/{new_file_name}")
-        media_directory = os.listdir(f"{os.getcwd()}/media/")
-        for uploaded_file in media_directory:
-            if file_name in uploaded_file:
-                os.remove(f"{os.getcwd()}/media/{uploaded_file}")
+            if sheet_result is not None:
+                results.append(sheet_result)
+        shutil.rmtree(sheet_directory)
     else:
         results = upload_geographic_file(
             file_path=file_path, table_name=file_name, app=app, zip_file=zip_file
         )
-    media_directory = os.listdir(f"{os.getcwd()}/media/")
-    for uploaded_file in media_directory:
-        if file_name in uploaded_file and os.path.isfile(
-            f"{os.getcwd()}/media/{uploaded_file}"
-        ):
-            os.remove(f"{os.getcwd()}/media/{uploaded_file}")
-    if os.path.exists(f"{os.getcwd()}/media/{file_name}"):
-        shutil.rmtree(f"{os.getcwd()}/media/{file_name}")
 
     if zip_file:
         return results[0]
     return results
 
 
+def save_upload_file(source, file_path: str):
+    """
+    Copies an uploaded file to the given path.
+
+    Uploads that have been spooled to a temporary file on disk are copied with
+    os.sendfile so the data stays in the kernel. Small uploads that are still held
+    in memory are written out in a single call.
+
+    Args:
+        source: The SpooledTemporaryFile of the upload.
+        file_path (str): The path to the file to be written.
+    """
+    source.seek(0)
+    with open(file_path, "wb") as destination:
+        if not getattr(source, "_rolled", False):
+            shutil.copyfileobj(source, destination, DEFAULT_CHUNK_SIZE)
+            return
+
+        source_fd = source.fileno()
+        size = os.fstat(source_fd).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(
+                    destination.fileno(), source_fd, offset, size - offset
+                )
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            source.seek(offset)
+            shutil.copyfileobj(source, destination, DEFAULT_CHUNK_SIZE)
+
+
+def upload_worksheet_csv(
+    write_file_path: str, sheet_name: str, app: FastAPI
+) -> dict | None:
+    """
+    Uploads a CSV file written from a worksheet. Worksheets without a matching
+    geography are imported as plain tables instead of being rejected, and blank
+    worksheets are skipped.
+
+    Args:
+        write_file_path (str): The path to the CSV file written from the worksheet.
+        sheet_name (str): The name of the worksheet.
+        app (FastAPI): The FastAPI application instance.
+
+    Returns:
+        dict | None: The result of the upload, or None if the worksheet is blank.
+    """
+    if read_csv_header(write_file_path) == []:
+        return None
+
+    result = upload_csv_file(
+        write_file_path=write_file_path,
+        file_name=os.path.basename(write_file_path),
+        app=app,
+    )
+
+    if result["status"] is False:
+        result = import_table(file_path=write_file_path, table_name=sheet_name, app=app)
+
+    return result
+
+
+def write_worksheet_csv(worksheet, file_path: str):
+    """
+    Writes the values of an openpyxl worksheet to a CSV file.
+
+    Args:
+        worksheet: The worksheet to be written.
+        file_path (str): The path to the CSV file to be written.
+    """
+    with open(file_path, "w", newline="", buffering=1024 * 1024) as csvfile:
+        csv.writer(csvfile).writerows(worksheet.iter_rows(values_only=True))
+
+
+@lru_cache(maxsize=1024)
 def clean_string(string: str):
     """
     Clean a string by removing spaces, dashes, periods, and colons, and
     converting to lowercase. This is used to clean strings that are used
-    as database table names.
+    as database table and column names. Results are cached since column
+    headers repeat across uploads.
 
     Args:
         string (str): The string to be cleaned.
@@ -94,69 +190,270 @@ def clean_string(string: str):
     Returns:
         str: The cleaned string.
     """
-    return (
-        string.replace(" ", "_")
-        .replace("-", "_")
-        .replace(".", "")
-        .replace(":", "_")
-        .lower()
-    )
+    return string.translate(CLEAN_STRING_TABLE).lower()
 
 
-def delete_files(file_name: str):
+def index_geographies(geographies: list) -> dict:
     """
-    Deletes files and directories from the media directory that match the given file name.
+    Builds the reverse lookup used by find_matching_geographies.
 
-    This function iterates through the files in the media directory and removes any files
-    that contain the specified file name. It also removes a directory with the specified
-    file name if it exists.
+    Maps every lowercased potential name to the geography fields it can fill, as
+    `(geography_index, field, priority)` tuples where `priority` is the position of
+    the name in the field's `potential_names`. This is run once when the geographies
+    are loaded, so matching a file only needs one lookup per column.
 
     Args:
-        file_name (str): The name of the file or directory to be deleted.
+        geographies (list): The geographies loaded from geographies.json, in rank order.
+
+    Returns:
+        dict: The potential names mapped to the geography fields they match.
     """
-    media_directory = os.listdir(f"{os.getcwd()}/media/")
-    for file in media_directory:
-        if file_name in file and os.path.isfile(f"{os.getcwd()}/media/{file}"):
-            os.remove(f"{os.getcwd()}/media/{file}")
-    if os.path.exists(f"{os.getcwd()}/media/{file_name}"):
-        shutil.rmtree(f"{os.getcwd()}/media/{file_name}")
+    potential_names: dict[str, list] = {}
+    for geography_index, geography in enumerate(geographies):
+        for field, value in geography["fields"].items():
+            for priority, name in enumerate(value["potential_names"]):
+                potential_names.setdefault(name.lower(), []).append(
+                    (geography_index, field, priority)
+                )
+
+    return potential_names
 
 
 def find_matching_geographies(column_names: list, app: FastAPI):
     """
     Finds and returns a list of geographies that match the provided column names.
 
-    Iterates through the predefined `GEOGRAPHIES` list, checking if the given
-    column names match the potential names for each field in a geography. A geography
-    is considered a match if all its fields have at least one column name that matches
-    one of their potential names.
+    Looks up each column name in the `app.state.potential_names` index to find the
+    geography fields it can fill. A geography is considered a match if all its fields
+    have at least one column name that matches one of their potential names. When
+    several columns match a field, the one matching the latest potential name is used,
+    and of columns matching the same potential name, the last one. Column names are
+    compared case-insensitively and each match is reported with the column name as it
+    appears in the file.
 
     Args:
         column_names (list): A list of column names to match against the potential names of geography fields.
         app (FastAPI): The FastAPI application instance.
 
     Returns:
-        list: A list of geographies that have fields matching the provided column names. Each geography
-              includes a `field_matches` dictionary indicating which column names matched each field.
+        list: A list of geographies that have fields matching the provided column names, in the
+              same rank order as `app.state.geographies`. Each geography includes a
+              `field_matches` dictionary indicating which column names matched each field.
     """
+    hits: dict[int, dict[str, tuple[int, str]]] = {}
+    for column_name in column_names:
+        column = column_name.strip()
+        for geography_index, field, priority in app.state.potential_names.get(
+            column.lower(), ()
+        ):
+            field_hits = hits.setdefault(geography_index, {})
+            if field not in field_hits or priority >= field_hits[field][0]:
+                field_hits[field] = (priority, column)
+
     matching_geographies = []
+    for geography_index in sorted(hits):
+        geography = app.state.geographies[geography_index]
+        field_hits = hits[geography_index]
+        if len(field_hits) == len(geography["fields"]):
+            field_matches = {
+                field: field_hits[field][1] for field in geography["fields"]
+            }
+            matching_geographies.append({**geography, "field_matches": field_matches})
+
+    return matching_geographies
+
+
+@contextmanager
+def get_db_connection(app: FastAPI) -> Iterator[psycopg2.extensions.connection]:
+    """
+    Borrows a connection from the application's connection pool for the duration of a
+    transaction.
+
+    ThreadedConnectionPool raises PoolError instead of waiting when every connection
+    is in use, so callers first acquire `app.state.pg_pool_slots`, a semaphore with one
+    slot per pooled connection, and wait there until a connection is free.
+
+    The transaction is committed when the block exits normally and rolled back if an
+    exception is raised. The connection is returned to the pool afterwards.
 
+    Args:
+        app (FastAPI): The FastAPI application instance.
+    """
+    with app.state.pg_pool_slots:
+        connection = app.state.pg_pool.getconn()
+        try:
+            with connection:
+                yield connection
+        finally:
+            app.state.pg_pool.putconn(connection, close=bool(connection.closed))
+
+
+def index_map_services(app: FastAPI):
+    """
+    Creates an index on LOWER() of every join column of the map service tables so
+    that join_to_map_service can look up matching rows instead of scanning the map.
+
+    Map service tables that do not exist in the database are skipped.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+    """
     for geography in app.state.geographies:
-        valid_match = []
-        field_matches = {}
-        for column in geography["fields"]:
-            valid_field_match = False
-            for geo_column in geography["fields"][column]["potential_names"]:
-                for column_name in column_names:
-                    if column_name.strip() == geo_column:
-                        valid_field_match = True
-                        field_matches[column] = column_name.strip()
-            valid_match.append(valid_field_match)
-        if all(valid_match):
-            geography["field_matches"] = field_matches
-            matching_geographies.append(geography)
+        if (
+            geography["name"] == POINT_GEOGRAPHY
+            or geography["name"] in GEOMETRY_GEOGRAPHIES
+        ):
+            continue
+        for field in geography["fields"]:
+            try:
+                with (
+                    get_db_connection(app) as connection,
+                    connection.cursor() as cursor,
+                ):
+                    cursor.execute(
+                        "SELECT 1 WHERE to_regclass(%s) IS NOT NULL",
+                        (f'"{geography["name"]}"',),
+                    )
+                    if cursor.fetchone() is None:
+                        continue
+                    cursor.execute(
+                        sql.SQL(
+                            "CREATE INDEX IF NOT EXISTS {index} ON {table} (LOWER({column}))"
+                        ).format(
+                            index=sql.Identifier(
+                                f"{geography['name']}_{field}_lower_idx"
+                            ),
+                            table=sql.Identifier(geography["name"]),
+                            column=sql.Identifier(field),
+                        )
+                    )
+            except psycopg2.Error:
+                continue
+
+
+def read_csv_header(file_path: str) -> list:
+    """
+    Reads the header row of a CSV file.
+
+    Args:
+        file_path (str): The path to the CSV file.
+
+    Returns:
+        list: The values of the header row.
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as csv_file:
+        return next(csv.reader(csv_file), [])
+
+
+def get_column_names(header: list) -> list:
+    """
+    Converts the values of a CSV header row into unique PostgreSQL column names.
+
+    Args:
+        header (list): The values of the header row.
+
+    Returns:
+        list: A column name for each value in the header row.
+    """
+    column_names: list[str] = []
+    for index, value in enumerate(header):
+        column_name = clean_string(value.strip()) or f"field_{index + 1}"
+        while column_name in column_names or column_name in RESERVED_COLUMN_NAMES:
+            column_name = f"{column_name}_{index + 1}"
+        column_names.append(column_name)
+
+    return column_names
 
-    return matching_geographies
+
+def copy_csv(cursor, file_path: str, table_name: str, unlogged: bool = True) -> dict:
+    """
+    Copies a CSV file into a new PostgreSQL table using COPY FROM STDIN.
+
+    Every column is created as text, the same as ogr2ogr's CSV driver, and a serial
+    gid primary key is added. Any existing table with the same name is dropped.
+
+    Args:
+        cursor: The database cursor used to create and load the table.
+        file_path (str): The path to the CSV file to be copied.
+        table_name (str): The name of the PostgreSQL table to create.
+        unlogged (bool): Whether to create an unlogged table. Staging tables that are
+            dropped in the same transaction are unlogged; tables that are kept are not.
+
+    Returns:
+        dict: A mapping of each header value in the CSV file to its column name.
+    """
+    header = read_csv_header(file_path)
+    column_names = get_column_names(header)
+    table = sql.Identifier(table_name)
+    columns = sql.SQL(", ").join(map(sql.Identifier, column_names))
+
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {};").format(table))
+    cursor.execute(
+        sql.SQL("CREATE {}TABLE {} (gid serial PRIMARY KEY, {});").format(
+            sql.SQL("UNLOGGED " if unlogged else ""),
+            table,
+            sql.SQL(", ").join(
+                sql.SQL("{} text").format(sql.Identifier(column_name))
+                for column_name in column_names
+            ),
+        )
+    )
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER true)")
+    with open(file_path, "rb") as csv_file:
+        cursor.copy_expert(copy_sql.format(table, columns).as_string(cursor), csv_file)
+
+    return dict(zip([value.strip() for value in header], column_names))
+
+
+def create_geometry_table(
+    cursor,
+    table_name: str,
+    columns: list,
+    geometry_type: str,
+    geometry_sql: sql.Composable,
+):
+    """
+    Creates a table with a geom column from a staging table loaded with copy_csv.
+
+    The table is written once with CREATE TABLE AS, computing the geometry server side
+    from geometry_sql, rather than adding the column to the staging table and updating
+    every row. The staging table is dropped afterwards and a primary key and spatial
+    index are created. gid is made an identity column that continues after the copied
+    values, so rows inserted later get a gid the same way as with ogr2ogr's FID=gid.
+
+    Args:
+        cursor: The database cursor used to create the table.
+        table_name (str): The name of the PostgreSQL table to create. The staging
+            table is expected to be named `{table_name}_temp`.
+        columns (list): The staging table columns to keep.
+        geometry_type (str): The PostGIS type of the geom column.
+        geometry_sql (sql.Composable): The SQL expression used to build each geometry.
+    """
+    table = sql.Identifier(table_name)
+    temp_table = sql.Identifier(f"{table_name}_temp")
+
+    cursor.execute(
+        sql.SQL(
+            """DROP TABLE IF EXISTS {table};
+            CREATE TABLE {table} AS
+                SELECT {columns}, ({geometry})::{geometry_type} AS geom
+                FROM {temp_table};
+            DROP TABLE {temp_table};
+            ALTER TABLE {table} ADD PRIMARY KEY (gid);
+            ALTER TABLE {table} ALTER COLUMN gid ADD GENERATED BY DEFAULT AS IDENTITY;
+            SELECT setval(pg_get_serial_sequence({table_name}, 'gid'), max(gid))
+                FROM {table};
+            CREATE INDEX ON {table} USING GIST (geom);
+            """
+        ).format(
+            table=table,
+            table_name=sql.Literal(table.as_string(cursor)),
+            temp_table=temp_table,
+            columns=sql.SQL(", ").join(map(sql.Identifier, ["gid", *columns])),
+            geometry=geometry_sql,
+            geometry_type=sql.SQL(geometry_type),
+        )
+    )
 
 
 def import_point_dataset(
@@ -167,11 +464,11 @@ def import_point_dataset(
     app: FastAPI,
 ):
     """
-    Imports a point dataset into a PostgreSQL database using the ogr2ogr command.
+    Imports a point dataset into a PostgreSQL database using COPY.
 
-    This function utilizes ogr2ogr to convert a file containing point data into a PostgreSQL
-    table. The function specifies the latitude and longitude fields to be used for point
-    geometry creation.
+    This function copies a CSV file containing point data into a staging table and
+    then creates the final table with a point geometry built from the latitude and
+    longitude fields. Values that are not numeric result in an empty geometry.
 
     Args:
         file_path (str): The path to the file containing the point dataset.
@@ -182,31 +479,99 @@ def import_point_dataset(
     """
     table_name = clean_string(table_name)
 
-    result = subprocess.run(
-        f"""ogr2ogr \
-        -f "PostgreSQL" PG:"dbname={app.state.dbname} user={app.state.dbuser} password={app.state.dbpass} host={app.state.dbhost} port={app.state.dbport}" \
-        {file_path} \
-        -oo X_POSSIBLE_NAMES={longitude}* \
-        -oo Y_POSSIBLE_NAMES={latitude}* \
-        -nln {table_name} \
-        -a_srs "EPSG:4326" \
-        -lco GEOMETRY_NAME=geom \
-        -lco FID=gid \
-        -nlt POINT \
-        -overwrite""",
-        capture_output=True,
-        text=True,
-        shell=True,
-    )
+    try:
+        with get_db_connection(app) as connection, connection.cursor() as cursor:
+            columns = copy_csv(cursor, file_path, f"{table_name}_temp")
+            create_geometry_table(
+                cursor,
+                table_name=table_name,
+                columns=list(columns.values()),
+                geometry_type="geometry(Point, 4326)",
+                geometry_sql=sql.SQL("ST_SetSRID(ST_MakePoint({}, {}), 4326)").format(
+                    COORDINATE_SQL.format(
+                        column=sql.Identifier(columns.get(longitude, longitude))
+                    ),
+                    COORDINATE_SQL.format(
+                        column=sql.Identifier(columns.get(latitude, latitude))
+                    ),
+                ),
+            )
+    except psycopg2.Error as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error).strip()
+        )
 
-    if result.returncode != 0 and "failure" in result.stderr.lower():
-        default_error = result.stderr
+    return {
+        "status": True,
+        "table_name": table_name,
+    }
 
-        if "Unable to open datasource" in default_error:
-            default_error = "The file provided is not a valid geographic file or has invalid geometry."
-        delete_files(table_name)
+
+def import_table(file_path: str, table_name: str, app: FastAPI):
+    """
+    Imports a CSV file without a geography into a PostgreSQL table using COPY.
+
+    Args:
+        file_path (str): The path to the CSV file to be imported.
+        table_name (str): The name of the PostgreSQL table where the data will be imported.
+        app (FastAPI): The FastAPI application instance.
+    """
+    table_name = clean_string(table_name)
+
+    try:
+        with get_db_connection(app) as connection, connection.cursor() as cursor:
+            copy_csv(cursor, file_path, table_name, unlogged=False)
+    except psycopg2.Error as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error).strip()
+        )
+
+    return {
+        "status": True,
+        "table_name": table_name,
+    }
+
+
+def stream_csv_geom_to_pg(
+    file_path: str,
+    geom_column: str,
+    geom_kind: str,
+    table_name: str,
+    app: FastAPI,
+):
+    """
+    Imports a CSV file with a GeoJSON, WKT, or WKB geometry column into a PostgreSQL
+    database using COPY.
+
+    The CSV file is copied as is into a staging table and the geometries are parsed by
+    PostGIS, so no intermediate GeoJSON file is written. The geom column is left
+    without a type modifier so that geometries with Z or M coordinates are kept as
+    they are. The source geometry column is left out of the final table.
+
+    Args:
+        file_path (str): The path to the CSV file to be imported.
+        geom_column (str): The column name in the file that contains the geometries.
+        geom_kind (str): The encoding of the geometries, one of geojson, wkt, or wkb.
+        table_name (str): The name of the PostgreSQL table where the data will be imported.
+    """
+    table_name = clean_string(table_name)
+
+    try:
+        with get_db_connection(app) as connection, connection.cursor() as cursor:
+            columns = copy_csv(cursor, file_path, f"{table_name}_temp")
+            column = columns.get(geom_column, geom_column)
+            create_geometry_table(
+                cursor,
+                table_name=table_name,
+                columns=[name for name in columns.values() if name != column],
+                geometry_type="geometry",
+                geometry_sql=GEOMETRY_SQL[geom_kind].format(
+                    column=sql.Identifier(column)
+                ),
+            )
+    except psycopg2.Error as error:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=default_error
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error).strip()
         )
 
     return {
@@ -224,11 +589,11 @@ def join_to_map_service(
     app: FastAPI,
 ):
     """
-    Joins a file containing data to a map service using the ogr2ogr command.
+    Joins a file containing data to a map service using COPY.
 
-    This function utilizes ogr2ogr to convert a file containing data into a PostgreSQL
-    table and then joins that table to a map service table based on matching values between
-    the two tables.
+    This function copies a CSV file containing data into a temporary PostgreSQL
+    table and then joins that table to a map service table based on matching values
+    between the two tables.
 
     Args:
         file_path (str): The path to the file containing the data.
@@ -239,56 +604,79 @@ def join_to_map_service(
     """
     table_name = clean_string(table_name)
 
-    result = subprocess.run(
-        f"""ogr2ogr -f "PostgreSQL" PG:"dbname={app.state.dbname} user={app.state.dbuser} password={app.state.dbpass} host={app.state.dbhost} port={app.state.dbport}" \
-        {file_path} -nln {table_name}_temp -lco FID=gid  -overwrite""",
-        capture_output=True,
-        text=True,
-        shell=True,
-    )
-
-    if result.returncode != 0 and "failure" in result.stderr.lower():
-        default_error = result.stderr
-
-        if "Unable to open datasource" in default_error:
-            default_error = "The file provided is not a valid geographic file or has invalid geometry."
-
-        delete_files(table_name)
-
+    try:
+        with get_db_connection(app) as connection, connection.cursor() as cursor:
+            columns = copy_csv(cursor, file_path, f"{table_name}_temp")
+            table_match_column = columns.get(table_match_column, table_match_column)
+            cursor.execute(
+                sql.SQL(
+                    """DROP TABLE IF EXISTS {table};
+                    CREATE TABLE {table} AS
+                        SELECT a.*, b.{map_column}, b.geom
+                        FROM {temp_table} as a
+                        LEFT JOIN {map_table} as b
+                        ON LOWER(a.{table_column}) = LOWER(b.{map_column});
+                    DROP TABLE IF EXISTS {temp_table};
+                    """
+                ).format(
+                    table=sql.Identifier(table_name),
+                    temp_table=sql.Identifier(f"{table_name}_temp"),
+                    map_table=sql.Identifier(map_name),
+                    table_column=sql.Identifier(table_match_column),
+                    map_column=sql.Identifier(map_match_column),
+                )
+            )
+    except psycopg2.Error as error:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=default_error
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(error).strip()
         )
 
-    drop_table_query = f"""DROP TABLE IF EXISTS "{table_name}";"""
-    join_sql = f"""CREATE TABLE "{table_name}" AS
-            SELECT a.*, b."{map_match_column}", b.geom
-            FROM "{table_name}_temp" as a
-            LEFT JOIN "{map_name}" as b
-            ON LOWER(a."{table_match_column}") = LOWER(b."{map_match_column}");
-        """
-    drop_temp_table_query = f"""DROP TABLE IF EXISTS "{table_name}_temp";"""
-
-    connection = psycopg2.connect(
-        dbname=app.state.dbname,
-        user=app.state.dbuser,
-        password=app.state.dbpass,
-        host=app.state.dbhost,
-        port=app.state.dbport,
-    )
-    cursor = connection.cursor()
-    cursor.execute(drop_table_query)
-    cursor.execute(join_sql)
-    cursor.execute(drop_temp_table_query)
-    connection.commit()
-    cursor.close()
-    connection.close()
-
     return {
         "status": True,
         "table_name": table_name,
     }
 
 
+def ogr2ogr_command(source: str, table_name: str, app: FastAPI) -> list:
+    """
+    Builds the ogr2ogr arguments used to import a data source into a PostgreSQL table.
+
+    Features are loaded with COPY instead of individual INSERT statements, and the
+    load session does not wait for WAL flushes on commit. The table is given a gid
+    FID and a geom geometry column with a GiST index, and any existing table with
+    the same name is overwritten.
+
+    Args:
+        source (str): The data source to be imported.
+        table_name (str): The name of the PostgreSQL table where the data will be stored.
+        app (FastAPI): The FastAPI application instance.
+
+    Returns:
+        list: The ogr2ogr command and its arguments.
+    """
+    return [
+        OGR2OGR_PATH,
+        "--config",
+        "PG_USE_COPY",
+        "YES",
+        "-f",
+        "PostgreSQL",
+        f"PG:dbname={app.state.dbname} user={app.state.dbuser} password={app.state.dbpass} host={app.state.dbhost} port={app.state.dbport}",
+        "-doo",
+        "PRELUDE_STATEMENTS=SET synchronous_commit = off",
+        source,
+        "-nln",
+        table_name,
+        "-lco",
+        "FID=gid",
+        "-lco",
+        "GEOMETRY_NAME=geom",
+        "-lco",
+        "SPATIAL_INDEX=GIST",
+        "-overwrite",
+    ]
+
+
 def upload_geographic_file(
     file_path: str, table_name: str, app: FastAPI, zip_file: bool = False
 ):
@@ -300,19 +688,16 @@ def upload_geographic_file(
     any existing table with the same name.
 
     Args:
-        file_path (str): The path to the geographic file to be uploaded.
+        file_path (str): The path to the geographic file to be uploaded. This can also
+            be a GDAL virtual file system path such as /vsicurl/<url>.
         table_name (str): The name of the PostgreSQL table where the data will be stored.
     """
     table_name = clean_string(table_name)
 
     result = subprocess.run(
-        [
-            f"""ogr2ogr -f "PostgreSQL" PG:"dbname={app.state.dbname} user={app.state.dbuser} password={app.state.dbpass} host={app.state.dbhost} port={app.state.dbport}" \
-        {file_path} -nln {table_name} -lco FID=gid -lco GEOMETRY_NAME=geom  -overwrite"""
-        ],
+        ogr2ogr_command(source=file_path, table_name=table_name, app=app),
         capture_output=True,
         text=True,
-        shell=True,
     )
 
     if result.returncode != 0 and "failure" in result.stderr.lower():
@@ -321,8 +706,6 @@ def upload_geographic_file(
         if "Unable to open datasource" in default_error:
             default_error = "The file provided is not a valid geographic file or has invalid geometry."
 
-        delete_files(table_name)
-
         if zip_file:
             return [
                 {
@@ -345,109 +728,54 @@ def upload_geographic_file(
     ]
 
 
-def convert_csv_to_geojson(file_path: str):
-    """
-    Converts a CSV file to a GeoJSON file.
-
-    Args:
-        file_path (str): The path to the CSV file to be converted.
-    """
-    features = []
-    with open(file_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": json.loads(row["geojson"]),
-                    "properties": {k: v for k, v in row.items() if k != "geojson"},
-                }
-            )
-    geojson_object = {"type": "FeatureCollection", "features": []}
-    with open(file_path.replace(".csv", ".geojson"), "w") as f:
-        json.dump(geojson_object, f)
-
-
-def convert_wkt_geometry_to_geojson(wkt_string: str):
-    """
-    Converts a WKT geometry to a GeoJSON geometry.
-
-    Args:
-        wkt_string (str): The WKT geometry to be converted.
-
-    Returns:
-        dict: A GeoJSON geometry.
+def stream_features_to_pg(features: Iterable[dict], table_name: str, app: FastAPI):
     """
+    Streams GeoJSON features into a PostgreSQL table using the ogr2ogr command.
 
-    geometry = wkt.loads(wkt_string)
-
-    geojson_string = geojson.dumps(geometry.__geo_interface__)
-
-    return json.loads(geojson_string)
-
-
-def convert_wkt_to_geojson(file_path: str):
-    """
-    Converts a CSV file with WKT geometries to a GeoJSON file.
+    The features are written to ogr2ogr's standard input as newline delimited
+    GeoJSON as they are produced, so no intermediate file is written and the
+    features never need to be held in memory at once.
 
     Args:
-        file_path (str): The path to the CSV file to be converted.
-    """
-    features = []
-    with open(file_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": convert_wkt_geometry_to_geojson(row["wkt"]),
-                    "properties": {k: v for k, v in row.items() if k != "wkt"},
-                }
-            )
-    geojson_object = {"type": "FeatureCollection", "features": []}
-    with open(file_path.replace(".csv", ".geojson"), "w") as f:
-        json.dump(geojson_object, f)
-
-
-def convert_wkb_geometry_to_geojson(wkb_string: str):
-    """
-    Converts a WKB geometry to a GeoJSON geometry.
-
-    Args:
-        wkb_string (str): The WKB geometry to be converted.
+        features (Iterable[dict]): The GeoJSON features to be imported.
+        table_name (str): The name of the PostgreSQL table where the data will be stored.
+        app (FastAPI): The FastAPI application instance.
 
-    Returns:
-        dict: A GeoJSON geometry.
+    Raises:
+        HTTPException: If ogr2ogr fails to import the features.
     """
+    table_name = clean_string(table_name)
 
-    geometry = wkb.loads(wkb_string, hex=True)
-
-    geojson_string = geojson.dumps(geometry.__geo_interface__)
-
-    return json.loads(geojson_string)
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            ogr2ogr_command(
+                source="GeoJSONSeq:/vsistdin/", table_name=table_name, app=app
+            ),
+            stdin=subprocess.PIPE,
+            stderr=stderr,
+        )
+        assert process.stdin is not None
+        try:
+            for feature in features:
+                process.stdin.write(orjson.dumps(feature) + b"\n")
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        process.wait()
+        stderr.seek(0)
+        error = stderr.read().decode(errors="replace")
+
+    if process.returncode != 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error.strip() or "There was an error importing the features",
+        )
 
-
-def convert_wkb_to_geojson(file_path: str):
-    """
-    Converts a CSV file with WKB geometries to a GeoJSON file.
-
-    Args:
-        file_path (str): The path to the CSV file to be converted.
-    """
-    features = []
-    with open(file_path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            features.append(
-                {
-                    "type": "Feature",
-                    "geometry": convert_wkb_geometry_to_geojson(row["wkb"]),
-                    "properties": {k: v for k, v in row.items() if k != "wkb"},
-                }
-            )
-    geojson_object = {"type": "FeatureCollection", "features": features}
-    with open(file_path.replace(".csv", ".geojson"), "w") as f:
-        json.dump(geojson_object, f)
+    return [{"status": True, "table_name": table_name}]
 
 
 def upload_csv_file(write_file_path: str, file_name: str, app: FastAPI) -> dict:
@@ -455,7 +783,7 @@ def upload_csv_file(write_file_path: str, file_name: str, app: FastAPI) -> dict:
     Uploads a CSV file to a PostgreSQL database by finding a matching geography
     and either importing as points or joining to a map service.
 
-    This function reads the first two lines of the CSV file, finds a matching geography
+    This function reads the header row of the CSV file, finds a matching geography
     by comparing the column names against the potential names of geography fields, and
     either imports the file as point data or joins it to a map service table based on
     the matching geography.
@@ -468,54 +796,37 @@ def upload_csv_file(write_file_path: str, file_name: str, app: FastAPI) -> dict:
     Returns:
         object: A dictionary containing a status and message. The status is True if the upload is successful and False if no matching geography is found. The message is a human-readable description of the result.
     """
-    with open(write_file_path) as input_file:
-        head = [next(input_file) for _ in range(2)]
-    matching_geographies = find_matching_geographies(head[0].split(","), app)
+    matching_geographies = find_matching_geographies(
+        read_csv_header(write_file_path), app
+    )
     if len(matching_geographies) == 0:
         return {"status": False, "message": "No matching geography found"}
-    matching_geography = sorted(matching_geographies, key=lambda x: x["rank"])[0]
-    if matching_geography["name"] == "latitude_and_longitude":
+    matching_geography = matching_geographies[0]
+    table_name = clean_string(os.path.splitext(file_name)[0])
+    if matching_geography["name"] == POINT_GEOGRAPHY:
         import_point_dataset(
             file_path=write_file_path,
             latitude=matching_geography["field_matches"]["latitude"],
             longitude=matching_geography["field_matches"]["longitude"],
-            table_name=file_name.split(".")[0],
+            table_name=table_name,
             app=app,
         )
 
-    elif matching_geography["name"] == "geojson_geometry":
-        convert_csv_to_geojson(file_path=write_file_path)
-        upload_geographic_file(
-            file_path=write_file_path.replace(".csv", ".geojson"),
-            table_name=file_name.split(".")[0],
-            app=app,
-        )
-        os.remove(write_file_path.replace(".csv", ".geojson"))
-
-    elif matching_geography["name"] == "wkt_geometry":
-        convert_wkt_to_geojson(file_path=write_file_path)
-        upload_geographic_file(
-            file_path=write_file_path.replace(".csv", ".geojson"),
-            table_name=file_name.split(".")[0],
-            app=app,
-        )
-        os.remove(write_file_path.replace(".csv", ".geojson"))
-
-    elif matching_geography["name"] == "wkb_geometry":
-        convert_wkb_to_geojson(file_path=write_file_path)
-        upload_geographic_file(
-            file_path=write_file_path.replace(".csv", ".geojson"),
-            table_name=file_name.split(".")[0],
+    elif matching_geography["name"] in GEOMETRY_GEOGRAPHIES:
+        stream_csv_geom_to_pg(
+            file_path=write_file_path,
+            geom_column=matching_geography["field_matches"]["geometry"],
+            geom_kind=matching_geography["name"].removesuffix("_geometry"),
+            table_name=table_name,
             app=app,
         )
-        os.remove(write_file_path.replace(".csv", ".geojson"))
 
     else:
         map_match_column = list(matching_geography["field_matches"].keys())[0]
 
         join_to_map_service(
             file_path=write_file_path,
-            table_name=file_name.split(".")[0],
+            table_name=table_name,
             map_name=matching_geography["name"],
             table_match_column=matching_geography["field_matches"][map_match_column],
             map_match_column=map_match_column,
@@ -524,5 +835,5 @@ def upload_csv_file(write_file_path: str, file_name: str, app: FastAPI) -> dict:
 
     return {
         "status": True,
-        "table_name": file_name.split(".")[0],
+        "table_name": table_name,
     }
@@ -1,6 +1,4 @@
 import os
-import json
-from contextlib import asynccontextmanager
 
 import psycopg
 import pytest
@@ -55,22 +53,9 @@ def database_wrapper(database):
 def create_app(database) -> FastAPI:
     """Create Application."""
 
+    from api.main import lifespan
     from api.routers.upload_anything import router as upload_anything_router
 
-    @asynccontextmanager
-    async def lifespan(app: FastAPI):
-        """
-        FastAPI lifespan event to initialize the application.
-
-        This event is called on application startup and shutdown. On startup, it reads the
-        geographies.json file to initialize the list of geographies.
-        """
-        if os.path.exists("api/geographies.json") is False:
-            raise Exception("api/geographies.json not found")
-        with open("api/geographies.json", "r") as f:
-            app.state.geographies = json.loads(f.read())
-        yield
-
     app = FastAPI(
         title="pg-upload-anything-api",
         description="API for uploading any geographic data to a PostgreSQL database.",
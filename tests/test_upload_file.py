@@ -1,5 +1,7 @@
 import os
 
+import psycopg
+
 def test_upload_file_csv(app):
     """
     Test the upload file endpoint with a CSV file.
@@ -68,4 +70,165 @@ def test_upload_file_csv(app):
     # Test with a shapefile
     with open(f"{os.getcwd()}/tests/files/pass/valid_shapefile.zip", "rb") as f:
         response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+
+def fetch_all(database, query: str) -> list:
+    """
+    Runs a query against the test database and returns every row.
+    """
+
+    db_url = f"postgresql://{database.user}:{database.password}@{database.host}:{database.port}/{database.dbname}"
+    with psycopg.connect(db_url) as conn:
+        return conn.execute(query).fetchall()
+
+
+def test_upload_file_csv_3d_geometry(app, database_wrapper):
+    """
+    Test that CSV files with 3D WKT and GeoJSON geometries keep their Z coordinates.
+    """
+
+    # Test with a CSV file that mixes 2D and 3D WKT geometries
+    with open(f"{os.getcwd()}/tests/files/pass/wkt_z_test.csv", "rb") as f:
+        response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
+        assert response.status_code == 200
+        assert response.json() == [{"status": True, "table_name": "wkt_z_test"}]
+
+    assert fetch_all(
+        database_wrapper, "SELECT city, ST_NDims(geom) FROM wkt_z_test ORDER BY gid"
+    ) == [("chicago", 3), ("atlanta", 2), ("denver", 3)]
+
+    # Test with a CSV file that contains GeoJSON geometries with elevation
+    with open(f"{os.getcwd()}/tests/files/pass/cities_geojson_z.csv", "rb") as f:
+        response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
+        assert response.status_code == 200
+
+    assert fetch_all(
+        database_wrapper, "SELECT ST_Z(geom) FROM cities_geojson_z ORDER BY gid"
+    ) == [(181.0,), (1609.0,)]
+
+
+def test_upload_file_dotted_file_name(app):
+    """
+    Test that the table name returned for a file name with dots is the cleaned name
+    of the table that was created.
+    """
+
+    with open(f"{os.getcwd()}/tests/files/pass/us_capitals.csv", "rb") as f:
+        response = app.post(
+            "/api/v1/upload_anything/upload_file",
+            files={"file": ("us.capitals.csv", f, "text/csv")},
+        )
+        assert response.status_code == 200
+        assert response.json() == [{"status": True, "table_name": "uscapitals"}]
+
+
+def test_upload_file_xlsx_without_geography(app, database_wrapper):
+    """
+    Test that workbook sheets without a matching geography are imported as plain,
+    logged tables next to the sheets that have one, and that blank sheets and chart
+    sheets are skipped.
+    """
+
+    with open(f"{os.getcwd()}/tests/files/pass/mixed_sheets_excel.xlsx", "rb") as f:
+        response = app.post(
+            "/api/v1/upload_anything/upload_file",
+            files={
+                "file": (
+                    "mixed_sheets_excel.xlsx",
+                    f,
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
+            },
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"status": True, "table_name": "population"},
+            {"status": True, "table_name": "capitals"},
+        ]
+
+    assert fetch_all(
+        database_wrapper,
+        "SELECT name, population FROM population ORDER BY gid",
+    ) == [("Chicago", "2746388"), ("Atlanta", "498715")]
+    assert fetch_all(
+        database_wrapper,
+        "SELECT relpersistence FROM pg_class WHERE relname = 'population'",
+    ) == [("p",)]
+    assert fetch_all(
+        database_wrapper, "SELECT relname FROM pg_class WHERE relname = 'sheet2'"
+    ) == []
+
+
+def test_upload_file_csv_gid_default(app, database_wrapper):
+    """
+    Test that rows inserted after a CSV import get a gid after the imported rows.
+    """
+
+    with open(f"{os.getcwd()}/tests/files/pass/wkt_test.csv", "rb") as f:
+        response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
+        assert response.status_code == 200
+
+    (row_count, max_gid) = fetch_all(
+        database_wrapper, "SELECT count(*), max(gid) FROM wkt_test"
+    )[0]
+    assert row_count == max_gid
+
+    assert fetch_all(
+        database_wrapper, "INSERT INTO wkt_test (city) VALUES ('denver') RETURNING gid"
+    ) == [(max_gid + 1,)]
+
+
+def test_upload_file_csv_messy_points(app, database_wrapper):
+    """
+    Test that a latitude and longitude CSV with reserved, duplicate and empty headers
+    and non-numeric coordinates is imported with renamed columns and empty geometries.
+    """
+
+    with open(f"{os.getcwd()}/tests/files/pass/messy_points.csv", "rb") as f:
+        response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
+        assert response.status_code == 200
+        assert response.json() == [{"status": True, "table_name": "messy_points"}]
+
+    # Test that reserved, duplicate and empty headers get unique column names
+    assert fetch_all(
+        database_wrapper,
+        """SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'messy_points' ORDER BY ordinal_position""",
+    ) == [
+        ("gid",),
+        ("gid_1",),
+        ("name",),
+        ("name_3",),
+        ("field_4",),
+        ("latitude",),
+        ("longitude",),
+        ("geom_7",),
+        ("geom",),
+    ]
+
+    # Test that rows with non-numeric coordinates are kept without a geometry
+    assert fetch_all(
+        database_wrapper,
+        "SELECT gid_1, name, geom IS NULL FROM messy_points ORDER BY gid",
+    ) == [("10", "Chicago", False), ("20", "Nowhere", True), ("30", "Denver", False)]
+    assert fetch_all(
+        database_wrapper,
+        "SELECT ST_X(geom), ST_Y(geom) FROM messy_points WHERE name = 'Denver'",
+    ) == [(-104.9903, 39.7392)]
+
+
+def test_upload_file_csv_xy_points(app, database_wrapper):
+    """
+    Test that a CSV with uppercase X and Y columns, as exported by ArcGIS and QGIS,
+    is imported with X as the longitude and Y as the latitude.
+    """
+
+    with open(f"{os.getcwd()}/tests/files/pass/xy_points.csv", "rb") as f:
+        response = app.post("/api/v1/upload_anything/upload_file", files={"file": f})
+        assert response.status_code == 200
+        assert response.json() == [{"status": True, "table_name": "xy_points"}]
+
+    assert fetch_all(
+        database_wrapper, "SELECT city, ST_X(geom), ST_Y(geom) FROM xy_points ORDER BY gid"
+    ) == [("Chicago", -87.6298, 41.8781), ("Atlanta", -84.388, 33.749)]
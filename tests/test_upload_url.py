@@ -1,3 +1,74 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import orjson
+
+from api.routers.upload_anything import url_utilities
+
+
+class FakeOgcApiSession:
+    """
+    Serves pages of an OGC API - Features collection or a WFS layer from memory.
+    """
+
+    def __init__(
+        self,
+        feature_count: int,
+        page_size: int,
+        number_matched: bool = True,
+        ignore_offset: bool = False,
+    ):
+        self.features = [
+            {"type": "Feature", "id": index, "geometry": None, "properties": {}}
+            for index in range(feature_count)
+        ]
+        self.page_size = page_size
+        self.number_matched = number_matched
+        self.ignore_offset = ignore_offset
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        query = parse_qs(urlparse(url).query)
+        offset = int((query.get("offset") or query.get("startIndex") or ["0"])[0])
+        if self.ignore_offset:
+            offset = 0
+        limit = int((query.get("limit") or query.get("maxFeatures") or [self.page_size])[0])
+        page = {"features": self.features[offset : offset + limit]}
+        page["numberReturned"] = len(page["features"])
+        if self.number_matched:
+            page["numberMatched"] = len(self.features)
+        content = orjson.dumps(page)
+        return SimpleNamespace(status_code=200, content=content, text=content.decode())
+
+
+def upload_fake_collection(monkeypatch, session, wfs: bool = False) -> list:
+    """
+    Runs upload_ogc_api_feature_collection, or upload_ogc_wfs, against a fake
+    session and returns the ids of the features that would have been streamed to
+    ogr2ogr.
+    """
+
+    streamed = []
+
+    def stream_features_to_pg(features, table_name, app):
+        streamed.extend(feature["id"] for feature in features)
+        return [{"status": True, "table_name": table_name}]
+
+    monkeypatch.setattr(url_utilities, "stream_features_to_pg", stream_features_to_pg)
+    app = SimpleNamespace(state=SimpleNamespace(http=session))
+    if wfs:
+        url_utilities.upload_ogc_wfs(
+            "https://example.com/ows?service=WFS&request=GetFeature&typeName=lakes", app
+        )
+    else:
+        url_utilities.upload_ogc_api_feature_collection(
+            "https://example.com/collections/lakes", app
+        )
+
+    return streamed
+
+
 def test_arcgis_url(app):
     """
     Test the upload URL endpoint with an ArcGIS URL.
@@ -69,4 +140,54 @@ def test_flat_file_url(app):
 
     # Test with an invalid flat file URL
     response = app.post("/api/v1/upload_anything/upload_url", json={"url": "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/all_hour.geojson/1"})
-    assert response.status_code == 400
\ No newline at end of file
+    assert response.status_code == 400
+
+def test_ogc_api_features_paging(monkeypatch):
+    """
+    Test that OGC API - Features collections are paged to the end exactly once.
+    """
+
+    # Test with numberMatched reported by the server
+    assert upload_fake_collection(monkeypatch, FakeOgcApiSession(95, 10)) == list(
+        range(95)
+    )
+
+    # Test without numberMatched, ending on a short page
+    assert upload_fake_collection(
+        monkeypatch, FakeOgcApiSession(95, 10, number_matched=False)
+    ) == list(range(95))
+
+    # Test without numberMatched, ending on an empty page
+    assert upload_fake_collection(
+        monkeypatch, FakeOgcApiSession(100, 10, number_matched=False)
+    ) == list(range(100))
+
+    # Test with a server that ignores offset and returns the first page every time
+    session = FakeOgcApiSession(100, 10, number_matched=False, ignore_offset=True)
+    assert upload_fake_collection(monkeypatch, session) == list(range(10))
+    assert session.requests <= 1 + url_utilities.OGC_PAGE_WORKERS
+
+def test_ogc_wfs_paging(monkeypatch):
+    """
+    Test that OGC WFS layers are paged to the end exactly once.
+    """
+
+    # Test with a layer that fits in the first page
+    session = FakeOgcApiSession(20, 50, number_matched=False)
+    assert upload_fake_collection(monkeypatch, session, wfs=True) == list(range(20))
+    assert session.requests == 1
+
+    # Test ending on a short page
+    assert upload_fake_collection(
+        monkeypatch, FakeOgcApiSession(495, 50, number_matched=False), wfs=True
+    ) == list(range(495))
+
+    # Test ending on an empty page
+    assert upload_fake_collection(
+        monkeypatch, FakeOgcApiSession(500, 50, number_matched=False), wfs=True
+    ) == list(range(500))
+
+    # Test with a server that ignores startIndex and returns the first page every time
+    session = FakeOgcApiSession(500, 50, number_matched=False, ignore_offset=True)
+    assert upload_fake_collection(monkeypatch, session, wfs=True) == list(range(50))
+    assert session.requests <= 1 + url_utilities.OGC_PAGE_WORKERS
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import orjson
+from psycopg2.pool import PoolError
+
+from api.routers.upload_anything.utilities import (
+    find_matching_geographies,
+    get_column_names,
+    get_db_connection,
+    index_geographies,
+)
+
+
+def geographies_app():
+    """
+    Builds an app stand-in with the geographies from geographies.json loaded the
+    same way as the lifespan handler does.
+    """
+
+    with open(f"{os.getcwd()}/api/geographies.json", "rb") as f:
+        geographies = sorted(orjson.loads(f.read()), key=lambda x: x["rank"])
+
+    return SimpleNamespace(
+        state=SimpleNamespace(
+            geographies=geographies,
+            potential_names=index_geographies(geographies),
+        )
+    )
+
+
+def matches(column_names: list) -> list:
+    return [
+        (geography["name"], geography["field_matches"])
+        for geography in find_matching_geographies(column_names, geographies_app())
+    ]
+
+
+class FakeConnection:
+    closed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FakePool:
+    def __init__(self, size: int):
+        self.size = size
+        self.in_use = 0
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if self.in_use == self.size:
+                raise PoolError("connection pool exhausted")
+            self.in_use += 1
+        return FakeConnection()
+
+    def putconn(self, connection, close=False):
+        with self.lock:
+            self.in_use -= 1
+
+
+def test_get_db_connection_waits_for_a_free_connection():
+    """
+    Test that more concurrent callers than pooled connections wait for a connection
+    instead of failing with PoolError.
+    """
+
+    app = SimpleNamespace(
+        state=SimpleNamespace(
+            pg_pool=FakePool(2), pg_pool_slots=threading.BoundedSemaphore(2)
+        )
+    )
+
+    def borrow(_):
+        with get_db_connection(app):
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(borrow, range(16)))
+
+    assert app.state.pg_pool.in_use == 0
+
+
+def test_get_column_names():
+    """
+    Test that CSV header values are converted into unique PostgreSQL column names.
+    """
+
+    # Test that header values are cleaned
+    assert get_column_names(["City Name", " State ", "Pop-2020"]) == [
+        "city_name",
+        "state",
+        "pop_2020",
+    ]
+
+    # Test that empty header values are named after their position
+    assert get_column_names(["name", "", "  "]) == ["name", "field_2", "field_3"]
+
+    # Test that duplicate header values get the position of the duplicate appended
+    assert get_column_names(["Name", "name", "NAME"]) == ["name", "name_2", "name_3"]
+
+    # Test that the gid and geom columns added on import are not reused
+    assert get_column_names(["gid", "geom", "gid_1"]) == ["gid_1", "geom_2", "gid_1_3"]
+
+
+def test_index_geographies():
+    """
+    Test that potential names are indexed lowercased with their geography, field and
+    position.
+    """
+
+    index = index_geographies(
+        [
+            {"name": "a", "fields": {"x": {"potential_names": ["Lat", "y"]}}},
+            {"name": "b", "fields": {"z": {"potential_names": ["y"]}}},
+        ]
+    )
+
+    assert index == {"lat": [(0, "x", 0)], "y": [(0, "x", 1), (1, "z", 0)]}
+
+
+def test_find_matching_geographies():
+    """
+    Test the geographies matched for a set of column names.
+    """
+
+    # Test that matches are returned in rank order
+    assert [name for name, _ in matches(["state", "wkt"])] == [
+        "wkt_geometry",
+        "states",
+    ]
+
+    # Test that every field of a geography has to match
+    assert matches(["latitude"]) == []
+    assert matches(["lat", "lon", "name"]) == [
+        ("latitude_and_longitude", {"latitude": "lat", "longitude": "lon"})
+    ]
+
+    # Test that column names are matched case-insensitively and reported as written
+    assert matches([" Latitude", "LONGITUDE "]) == [
+        ("latitude_and_longitude", {"latitude": "Latitude", "longitude": "LONGITUDE"})
+    ]
+
+    # Test that x and y columns are matched as longitude and latitude
+    assert matches(["X", "Y"]) == [
+        ("latitude_and_longitude", {"latitude": "Y", "longitude": "X"})
+    ]
+
+    # Test that the latest potential name wins when several columns match a field
+    assert matches(["state", "state_name"]) == [
+        ("states", {"state_name": "state_name"})
+    ]
+    assert matches(["state_name", "state"]) == [
+        ("states", {"state_name": "state_name"})
+    ]
+
+    # Test that the last column wins when columns match the same potential name
+    assert matches(["State", "state"]) == [("states", {"state_name": "state"})]
+
+    # Test that no geography is matched for unknown column names
+    assert matches(["name", "population"]) == []